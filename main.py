@@ -5,26 +5,38 @@ ETL Control Center
 Contains the main function to update the database and manage the tickers list.
 """
 import streamlit as st
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
+import numpy as np
+import pyarrow.parquet as pq
+import pyarrow.dataset as ds
+import pyarrow.compute as pc
+from pathlib import Path
 from src.core import (
     load_tickers, save_tickers, add_tickers,
-    remove_tickers
+    remove_tickers, load_metadata, load_financials_manifest, parquet_tickers
 )
 from src.etl import update_stock_database, load_prices_log
-from src.config import dim_ticker_file, prices_log_file, stocks_folder
+from src.config import (
+    dim_ticker_file, dim_ticker_parquet, prices_log_file,
+    prices_folder, financials_folder, financials_manifest_file
+)
+
+# Page configuration
+st.set_page_config(layout="wide", page_title="EquitySchema", page_icon="🎛️")
 
 # --- Hide message "Press Ctrl+Enter in st.text_area()" ---
-st.markdown("""
+# Style-only st.html is sent to the page's event container, so it adds no layout element.
+# It must still be emitted on every rerun: Streamlit drops elements a rerun does not redraw.
+_HIDE_INPUT_INSTRUCTIONS_CSS = """
     <style>
     /* Hide the specific element that shows the input instructions */
     div[data-testid="InputInstructions"] {
         display: none;
     }
     </style>
-    """, unsafe_allow_html=True)
-
-# Page configuration
-st.set_page_config(layout="wide", page_title="EquitySchema", page_icon="🎛️")
+    """
+st.html(_HIDE_INPUT_INSTRUCTIONS_CSS)
 
 # --- Tickers management UI ---
 
@@ -42,6 +54,7 @@ def _add_tickers_dialog(tickers_df: pd.DataFrame):
         try:
             updated_tickers_df = add_tickers(user_input, tickers_df)
             save_tickers(updated_tickers_df)
+            _fetch_dashboad_data.clear()
             print("Tickers added successfully.")
         except Exception as e:
             print(f"Error adding tickers: {e}")
@@ -57,6 +70,7 @@ def _remove_tickers_dialog(tickers_df: pd.DataFrame, tickers_to_remove: list):
         try:
             updated_tickers_df = remove_tickers(tickers_df, tickers_to_remove)
             save_tickers(updated_tickers_df)
+            _fetch_dashboad_data.clear()
             print("Tickers removed successfully.")
         except Exception as e:
             print(f"Error removing tickers: {e}")
@@ -64,58 +78,153 @@ def _remove_tickers_dialog(tickers_df: pd.DataFrame, tickers_to_remove: list):
 
 # --- Dashboard data preparation ---
 
-def _fetch_dashboad_data(tickers_df: pd.DataFrame):
+def _mtime(path: Path) -> float:
+    """
+    Returns the last modification time of a file or folder (0.0 if it does not exist).
+    Used as a cache key so cached data is invalidated when files change on disk.
+    """
+    try:
+        return path.stat().st_mtime
+    except FileNotFoundError:
+        return 0.0
+
+def _load_available_financials() -> set:
+    """
+    Returns the set of tickers with financials data.
+    Uses the manifest written by the ETL, or a single directory scan if it is missing.
+    """
+    available = load_financials_manifest()
+    if available is None:
+        available = parquet_tickers(financials_folder)
+    return available
+
+def _load_dashboard_metadata() -> pd.DataFrame:
+    """
+    Loads the metadata columns shown in the dashboard, indexed by Ticker.
+    """
+    cols_to_load = ['Ticker', 'shortName', 'sector']
+    try:
+        metadata_df = load_metadata(columns = cols_to_load)
+    except (ValueError, KeyError) as e:
+        metadata_df = load_metadata() # Fallback if cols mismatch
+    return metadata_df.set_index('Ticker')
+
+@st.cache_data(show_spinner=False)
+def _cached_prices_log(log_mtime: float) -> dict:
+    """
+    Loads the prices log once per version of the file on disk.
+    The modification time is only used as cache key.
+    """
+    return load_prices_log()
+
+@st.cache_data(show_spinner=False)
+def _fetch_dashboad_data(tickers_tuple: tuple, dim_mtime: float, log_mtime: float, fin_mtime: float):
     """
     Fetches and prepares data for display in the dashboard.
     Optimized for performance: 
     1. Uses Lazy Loading for metadata (no blocking API calls).
     2. Vectorized check for Financials file existence.
+    3. Cached across reruns: the modification times are only cache keys, so the
+       table is rebuilt only when the tickers list or the files on disk change.
     """
-    # Load metadata (if available)
-    cols_to_load = ['Ticker', 'shortName', 'sector']
-    if dim_ticker_file.exists():
-        try:
-            metadata_df = pd.read_csv(dim_ticker_file, usecols = cols_to_load)
-        except ValueError as e:
-            metadata_df = pd.read_csv(dim_ticker_file) # Fallback if cols mismatch
-    else:
-        metadata_df = pd.DataFrame(columns=cols_to_load)
-    
-    # Merge Tickers with Metadata
-    display_df = pd.merge(tickers_df, metadata_df, on='Ticker', how='left')
+    tickers_df = pd.DataFrame(list(tickers_tuple), columns=['Ticker'])
 
-    # Merge with Price Log
-    prices_log = load_prices_log()    
+    # Load metadata, price log and financials availability concurrently (file I/O releases the GIL)
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        metadata_future = executor.submit(_load_dashboard_metadata)
+        financials_future = executor.submit(_load_available_financials)
+        # The cached price log needs the Streamlit script context, so it is loaded on this thread
+        prices_log = _cached_prices_log(log_mtime)
+        metadata_df = metadata_future.result()
+        available = financials_future.result()
+
+    # Join Tickers with Metadata (index-based join)
+    display_df = tickers_df.set_index('Ticker').join(metadata_df, how='left').reset_index()
+
+    # Ensure specific column order (missing columns are added as empty)
+    final_cols = ['Ticker', 'shortName', 'sector', 'lastPriceDate', 'financialsData']
+    display_df = display_df.reindex(columns=final_cols)
+
+    # Look up the last price date straight from the log dict {'AAPL': 'Date'}
+    display_df['lastPriceDate'] = display_df['Ticker'].map(prices_log)
 
-    # Create DataFrame from items {'AAPL': 'Date'} -> [('AAPL', 'Date')]
-    log_df = pd.DataFrame(list(prices_log.items()), columns=['Ticker', 'lastPriceDate'])
-    display_df = pd.merge(display_df, log_df, on='Ticker', how='left')
-    
     # Check Financials Data
-    display_df["financialsData"] = display_df["Ticker"].apply(
-        lambda x: "Yes" if (stocks_folder / 'financials' / f"{x}.parquet").exists() else "Nope"
-    )
+    display_df["financialsData"] = np.where(display_df["Ticker"].isin(available), "Yes", "Nope")
     # Fill NaN values for better UI
-    display_df['shortName'] = display_df['shortName'].fillna("Pending Update...")
-    display_df['sector'] = display_df['sector'].fillna("-")
-    display_df['lastPriceDate'] = display_df['lastPriceDate'].fillna("Pending Update...")
+    display_df = display_df.fillna({
+        'shortName': "Pending Update...",
+        'sector': "-",
+        'lastPriceDate': "Pending Update..."
+        })
 
-    # Ensure specific column order
-    final_cols = ['Ticker', 'shortName', 'sector', 'lastPriceDate', 'financialsData']
-    
-    # Add missing columns if they don't exist (safety check)
-    for col in final_cols:
-        if col not in display_df.columns:
-            display_df[col] = None
-            
-    return display_df[final_cols]
+    return display_df
+
+# --- Tickers panel ---
+
+@st.fragment
+def _tickers_panel(display_df: pd.DataFrame, tickers_df: pd.DataFrame):
+    """
+    Renders the tickers table and the Add/Remove buttons.
+    Runs as a fragment: selecting rows only reruns this panel, not the whole page.
+    Adding or removing tickers triggers a full rerun from the dialogs.
+    """
+    # Display table
+    st.subheader("Tickers in Database:")
+    event = st.dataframe(
+        display_df,
+        hide_index=True,
+        width = 850,
+        on_select= "rerun",
+        selection_mode="multi-row" 
+        )
+    # Count of tickers
+    st.markdown(f"**Count of tickers:** {len(tickers_df)}")  
+
+    # Get list of selected tickers from selected rows.
+    selected_indices = event.selection.rows # returns a list of numerical indices
+    selected_tickers_df = tickers_df.iloc[selected_indices]
+    selected_tickers = selected_tickers_df['Ticker'].tolist()
+
+    # Buttons for adding/removing tickers
+    col1, col2 = st.columns([1,5])
+    with col1:
+        if st.button("Remove Selected Tickers", disabled = not selected_tickers, type = "primary"):
+            _remove_tickers_dialog(tickers_df, selected_tickers)
+    st.markdown("---")
+    with col2:
+        if st.button("Add Tickers"):
+            _add_tickers_dialog(tickers_df)
 
 # --- Data Explorer ---
 
+@st.cache_data(show_spinner=False, max_entries=32)
+def _read_parquet(target_file: Path, file_mtime: float) -> pd.DataFrame:
+    """
+    Reads a Parquet file once per version of the file on disk.
+    The modification time is only used as cache key; the oldest entries
+    (e.g. versions replaced by a price update) are evicted past 32 files.
+    """
+    return pd.read_parquet(target_file)
+
+@st.cache_data(show_spinner=False)
+def _sorted_tickers(tickers_tuple: tuple) -> list:
+    """
+    Returns the tickers sorted alphabetically, cached per tickers list.
+    """
+    return sorted(tickers_tuple)
+
+def _read_preview(target_file: Path, n_rows: int = 1000) -> pd.DataFrame:
+    """
+    Reads only the first rows of a Parquet file for a quick preview.
+    """
+    with pq.ParquetFile(target_file) as pf:
+        batch = next(pf.iter_batches(batch_size=n_rows), None)
+    return batch.to_pandas() if batch is not None else pd.DataFrame()
+
 def _render_explorer(tickers_df: pd.DataFrame):
     """
     Render the Raw Data Explorer tab.
-    Allows viewing Metadata (CSV) or Prices/Financials (Parquet).
+    Allows viewing Metadata or Prices/Financials (Parquet).
     """
     st.subheader("🔍 Data Explorer")
     
@@ -128,8 +237,8 @@ def _render_explorer(tickers_df: pd.DataFrame):
 
     # 2. Logic for Metadata (Single File)
     if dataset_type == "Metadata (Dimension)":
-        if dim_ticker_file.exists():
-            df = pd.read_csv(dim_ticker_file)
+        df = load_metadata()
+        if not df.empty:
             st.markdown(f"**Records:** {len(df)}")
             st.dataframe(df, width='stretch')
         else:
@@ -140,32 +249,46 @@ def _render_explorer(tickers_df: pd.DataFrame):
         # Select Ticker
         selected_ticker = st.selectbox(
             "Select Ticker:", 
-            tickers_df['Ticker'].sort_values(), 
+            _sorted_tickers(tuple(tickers_df['Ticker'])), 
             width = 100
             )
         
         if selected_ticker:
             # Determine Path based on selection
             if "Prices" in dataset_type:
-                target_file = stocks_folder / 'prices' / f"{selected_ticker}.parquet"
+                target_file = prices_folder / f"{selected_ticker}.parquet"
             else:
-                target_file = stocks_folder / 'financials' / f"{selected_ticker}.parquet"
+                target_file = financials_folder / f"{selected_ticker}.parquet"
 
             # Load and Display
             if target_file.exists():
                 try:
-                    df = pd.read_parquet(target_file)
-                    
+                    # Row/column counts come from the Parquet footer (no data is loaded)
+                    with pq.ParquetFile(target_file) as pf:
+                        num_rows = pf.metadata.num_rows
+                        index_cols = (pf.schema_arrow.pandas_metadata or {}).get('index_columns', [])
+                        data_cols = [c for c in pf.schema_arrow.names if c not in index_cols]
+
                     # metrics
                     col1, col2, col3 = st.columns(3)
-                    with col1: st.metric("Rows", len(df))
-                    with col2: st.metric("Columns", len(df.columns))
+                    with col1: st.metric("Rows", num_rows)
+                    with col2: st.metric("Columns", len(data_cols))
                     if "Prices" in dataset_type:
-                        # Show date range for prices
-                        min_date = df.index.min().date() if isinstance(df.index, pd.DatetimeIndex) else df['Date'].min().date()
-                        max_date = df.index.max().date() if isinstance(df.index, pd.DatetimeIndex) else df['Date'].max().date()
+                        # Show date range for prices (reads only the Date column)
+                        if 'Date' in data_cols:
+                            date_col = ds.dataset(target_file, format='parquet').to_table(columns=['Date'])['Date']
+                            min_date, max_date = pc.min_max(date_col).as_py().values()
+                        else:
+                            dates = _read_parquet(target_file, _mtime(target_file)).index
+                            min_date, max_date = dates.min(), dates.max()
+                        min_date, max_date = min_date.date(), max_date.date()
                         with col3: st.write(f"**Range:** {min_date} to {max_date}")
 
+                    # Show a preview, the full table is only loaded on demand
+                    if st.toggle("Load full data", key=f"full_{dataset_type}"):
+                        df = _read_parquet(target_file, _mtime(target_file))
+                    else:
+                        df = _read_preview(target_file)
                     st.dataframe(df, width='stretch')
                 except Exception as e:
                     st.error(f"Error reading file: {e}")
@@ -187,40 +310,21 @@ def main():
 
     # --- Tab 1: Main ---
     with tab_main:
-        display_df = _fetch_dashboad_data(tickers_df)
-            
-        # Display table
-        st.subheader("Tickers in Database:")
-        event = st.dataframe(
-            display_df,
-            hide_index=True,
-            width = 850,
-            on_select= "rerun",
-            selection_mode="multi-row" 
+        display_df = _fetch_dashboad_data(
+            tuple(tickers_df['Ticker']),
+            _mtime(dim_ticker_parquet) or _mtime(dim_ticker_file),
+            _mtime(prices_log_file),
+            _mtime(financials_manifest_file) or _mtime(financials_folder)
             )
-        # Count of tickers
-        st.markdown(f"**Count of tickers:** {len(tickers_df)}")  
-
-        # Get list of selected tickers from selected rows.
-        selected_indices = event.selection.rows # returns a list of numerical indices
-        selected_tickers_df = tickers_df.iloc[selected_indices]
-        selected_tickers = selected_tickers_df['Ticker'].tolist()
-
-        # Buttons for adding/removing tickers
-        col1, col2 = st.columns([1,5])
-        with col1:
-            if st.button("Remove Selected Tickers", disabled = not selected_tickers, type = "primary"):
-                _remove_tickers_dialog(tickers_df, selected_tickers)
-        st.markdown("---")
-        with col2:
-            if st.button("Add Tickers"):
-                _add_tickers_dialog(tickers_df)   
+            
+        _tickers_panel(display_df, tickers_df)
 
         # Update database section
         st.subheader("Update Database")
         if st.button("Update All Tickers Data"):
             with st.spinner("Updating data... This may take a while."):           
                 update_stock_database()
+            _fetch_dashboad_data.clear()
             print("Stock database updated successfully from dashboard.")
             st.rerun()
 
@@ -6,5 +6,9 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 DATA_DIR = BASE_DIR / "data"
 all_tickers_file = DATA_DIR / 'all_tickers.csv'
 stocks_folder = DATA_DIR / 'stocks'
+prices_folder = stocks_folder / 'prices'
+financials_folder = stocks_folder / 'financials'
 dim_ticker_file = stocks_folder / 'dim_ticker.csv'
-prices_log_file = stocks_folder / 'prices_log.json'
\ No newline at end of file
+dim_ticker_parquet = stocks_folder / 'dim_ticker.parquet'
+prices_log_file = stocks_folder / 'prices_log.json'
+financials_manifest_file = stocks_folder / 'financials_manifest.parquet'
\ No newline at end of file
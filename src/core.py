@@ -2,16 +2,56 @@
 src.core.py
 Core functionalities for EquitySchema application.
 """
+import os
 import pandas as pd
 import json
+import re
+import time
 import yfinance as yf
+try:
+    import orjson # Optional: faster JSON parsing/serialization for the prices log
+except ImportError:
+    orjson = None
 from pathlib import Path
 from src.config import (
-    all_tickers_file, prices_log_file, stocks_folder,
-    dim_ticker_file
+    all_tickers_file, prices_log_file, prices_folder, financials_folder,
+    dim_ticker_file, dim_ticker_parquet, financials_manifest_file
 )
+# --- yfinance helpers ---
+
+def yf_download(tickers: list, retries: int = 3, wait_seconds: float = 2, retry_empty: bool = True, **kwargs) -> pd.DataFrame:
+    """
+    Downloads history for several tickers in one batched yfinance request.
+    Retries with a short pause if the request fails, or returns nothing when retry_empty is set
+    (e.g. rate limited). Returns an empty DataFrame if all attempts fail.
+    """
+    for attempt in range(1, retries + 1):
+        try:
+            data = yf.download(tickers, progress=False, **kwargs)
+            if not data.empty or not retry_empty:
+                return data
+        except Exception as e:
+            print(f"Download attempt {attempt}/{retries} failed: {e}")
+        if attempt < retries:
+            time.sleep(wait_seconds)
+    return pd.DataFrame()
+
+# --- Data folder helpers ---
+
+def parquet_tickers(folder: Path) -> set:
+    """
+    Returns the tickers with a Parquet file in a data folder ({ticker}.parquet),
+    using a single directory scan. Returns an empty set if the folder does not exist.
+    """
+    try:
+        return {entry.name[:-8] for entry in os.scandir(folder) if entry.name.endswith('.parquet')}
+    except FileNotFoundError:
+        return set()
+
 # --- Ticker management functions ---
 
+_TICKER_SPLIT = re.compile(r'[\s,]+') # Separators accepted in the Add Tickers input
+
 def load_tickers(tickers_path: Path = all_tickers_file) -> pd.DataFrame:
     """
     Loads tickers from CSV. 
@@ -29,11 +69,9 @@ def load_tickers(tickers_path: Path = all_tickers_file) -> pd.DataFrame:
     # Recovery Mode: Scan the prices folder
     print(f"Ticker file not found or invalid at {tickers_path}. Attempting recovery...")
     
-    prices_dir = stocks_folder / 'prices'
-    
-    if prices_dir.exists():
+    if prices_folder.exists():
         # Extract ticker symbols from filenames
-        recovered_tickers = sorted(list({f.stem for f in prices_dir.glob("*.parquet")}))
+        recovered_tickers = sorted(parquet_tickers(prices_folder))
         
         if recovered_tickers:
             print(f"♻️  Recovered {len(recovered_tickers)} tickers from local data files.")
@@ -60,20 +98,28 @@ def add_tickers(new_tickers_str: str, tickers_df: pd.DataFrame) -> pd.DataFrame:
     Expects a string of tickers separated by spaces or commas.
     Returns the updated DataFrame.
     """
-    new_tickers = [ticker.strip().upper() for ticker in new_tickers_str.replace(",", " ").split() if ticker.strip() and ticker.strip().upper() not in tickers_df["Ticker"].values]
+    existing_tickers = set(tickers_df["Ticker"])
+    candidates = (ticker.upper() for ticker in _TICKER_SPLIT.split(new_tickers_str) if ticker)
+    # dict.fromkeys drops repeated tickers and keeps the input order
+    new_tickers = list(dict.fromkeys(ticker for ticker in candidates if ticker not in existing_tickers))
     
-    # Ticker validation
+    # Ticker validation: a single batched request for all candidates
+    # (if a ticker is invalid, its rows in the download will be empty)
     valid_tickers = []
-    for ticker in new_tickers:
-        try:
-            # if the ticker is invalid, the dataframe will be empty
-            hist = yf.Ticker(ticker).history(period="1d")
-            if not hist.empty:
-                valid_tickers.append(ticker)
-            else:
-                print(f"Ticker '{ticker}' found but has no data (likely invalid/delisted).")    
-        except Exception as e:
-            print(f"Ticker '{ticker}' caused an error: {e}")
+    if new_tickers:
+        history = yf_download(new_tickers, period="1d", group_by='ticker', threads=True, auto_adjust=False)
+        for ticker in new_tickers:
+            try:
+                if isinstance(history.columns, pd.MultiIndex):
+                    hist = history[ticker] if ticker in history.columns.get_level_values(0) else pd.DataFrame()
+                else:
+                    hist = history # Older yfinance versions return flat columns for a single ticker
+                if not hist.dropna(how='all').empty:
+                    valid_tickers.append(ticker)
+                else:
+                    print(f"Ticker '{ticker}' found but has no data (likely invalid/delisted).")    
+            except Exception as e:
+                print(f"Ticker '{ticker}' caused an error: {e}")
     
     if valid_tickers:
         updated_tickers_df = pd.concat([tickers_df, pd.DataFrame(valid_tickers, columns=["Ticker"])], ignore_index=True)
@@ -106,8 +152,7 @@ def remove_tickers(tickers_df: pd.DataFrame, tickers_to_remove: list) -> pd.Data
     # Remove from prices log file (JSON)
     if prices_log_file.exists():
         try:
-            with open(prices_log_file, 'r') as f:
-                prices_log = json.load(f)
+            prices_log = read_prices_log()
             log_changed = False
             for ticker in valid_removals:
                 if ticker in prices_log:
@@ -115,29 +160,26 @@ def remove_tickers(tickers_df: pd.DataFrame, tickers_to_remove: list) -> pd.Data
                     log_changed = True
 
             if log_changed:
-                with open(prices_log_file, 'w') as f:
-                    json.dump(prices_log, f, indent=4)
+                save_prices_log(prices_log)
                 print(f"Removed {len(valid_removals)} ticker(s) from prices log.")
         except Exception as e:
             print(f"Error updating prices log: {e}")
             
+    # Remove from metadata file (one vectorized filter and a single write)
+    try:
+        metadata_df = load_metadata()
+        removal_mask = metadata_df['Ticker'].isin(valid_removals)
+        if removal_mask.any():
+            save_metadata(metadata_df[~removal_mask])
+            print(f"Removed {removal_mask.sum()} ticker(s) from metadata file.")
+    except Exception as e:
+        print(f"Could not update metadata file: {e}")
+
     # Delete ticker data files in separated try-except blocks
     for ticker in valid_removals:
-        # remove from metadata file
-        try:
-            metadata_file = dim_ticker_file
-            if metadata_file.exists():
-                metadata_df = pd.read_csv(metadata_file)
-                if ticker in metadata_df['Ticker'].values:
-                    metadata_df = metadata_df[metadata_df['Ticker'] != ticker]
-                    metadata_df.to_csv(metadata_file, index=False)
-                    print(f"Removed ticker {ticker} from metadata file.")
-        except Exception as e:
-            print(f"Could not delete metadata file for ticker {ticker}: {e}")
-
         # remove prices file
         try:
-            price_file = stocks_folder / 'prices' / f"{ticker}.parquet"
+            price_file = prices_folder / f"{ticker}.parquet"
             if price_file.exists():
                 price_file.unlink()           
             print(f"Deleted price file for ticker {ticker}.")
@@ -146,12 +188,17 @@ def remove_tickers(tickers_df: pd.DataFrame, tickers_to_remove: list) -> pd.Data
 
         # Remove financials file
         try:
-            financials_file = stocks_folder / 'financials' / f"{ticker}.parquet"
+            financials_file = financials_folder / f"{ticker}.parquet"
             if financials_file.exists():
                 financials_file.unlink()
         except Exception as e:
             print(f"Could not delete financials file for ticker {ticker}: {e}") 
 
+    # Remove from financials manifest
+    available_financials = load_financials_manifest()
+    if available_financials is not None and available_financials & set(valid_removals):
+        save_financials_manifest(available_financials - set(valid_removals))
+
     return updated_tickers_df
 
 def save_tickers(tickers_df: pd.DataFrame, tickers_path: Path = all_tickers_file):
@@ -164,4 +211,96 @@ def save_tickers(tickers_df: pd.DataFrame, tickers_path: Path = all_tickers_file
     except Exception as e:
         print(f"Error saving tickers: {e}")
 
-    
\ No newline at end of file
+# --- Prices log storage functions ---
+
+def read_prices_log() -> dict:
+    """
+    Reads the raw prices log ({'AAPL': 'YYYY-MM-DD'}) from disk.
+    Uses orjson when installed, the standard json module otherwise.
+    Raises FileNotFoundError if the log does not exist.
+    """
+    raw = prices_log_file.read_bytes()
+    return orjson.loads(raw) if orjson else json.loads(raw)
+
+def save_prices_log(log_dict: dict):
+    """
+    Saves the prices log to disk (indented, human readable).
+    """
+    if orjson:
+        prices_log_file.write_bytes(orjson.dumps(log_dict, option=orjson.OPT_INDENT_2))
+    else:
+        with open(prices_log_file, 'w') as f:
+            json.dump(log_dict, f, indent=4)
+
+# --- Metadata (dim_ticker) storage functions ---
+
+# Column order and dtypes of the dimension table (dim_ticker).
+# Arrow-backed dtypes match what load_metadata returns; ratios stay double so dim_ticker.csv keeps full precision.
+METADATA_SCHEMA = {
+    'Ticker': 'string[pyarrow]', 'shortName': 'string[pyarrow]', 'sector': 'string[pyarrow]',
+    'industry': 'string[pyarrow]', 'country': 'string[pyarrow]',
+    'marketCap': 'int64[pyarrow]', 'beta': 'double[pyarrow]', 'dividendYield': 'double[pyarrow]',
+    '52WeekHigh': 'double[pyarrow]', '52WeekLow': 'double[pyarrow]',
+    'forwardPE': 'double[pyarrow]', 'priceToBook': 'double[pyarrow]',
+    'enterpriseToEbitda': 'double[pyarrow]', 'returnOnAssets': 'double[pyarrow]',
+    'lastUpdated': 'string[pyarrow]'
+}
+
+def load_metadata(columns: list = None) -> pd.DataFrame:
+    """
+    Loads the metadata dimension table (dim_ticker).
+    Prefers the Parquet copy (typed, with column projection) and falls back to the CSV export.
+    Returns an empty DataFrame if neither file exists.
+    """
+    try:
+        return pd.read_parquet(dim_ticker_parquet, columns=columns, dtype_backend='pyarrow')
+    except FileNotFoundError:
+        pass
+    try:
+        metadata_df = pd.read_csv(dim_ticker_file, usecols=columns, engine='pyarrow', dtype_backend='pyarrow')
+    except FileNotFoundError:
+        return pd.DataFrame(columns=columns or ['Ticker'])
+    # The CSV carries no types: an all-blank column (e.g. 'sector' for index/crypto tickers)
+    # is inferred as null[pyarrow], which cannot be filled. Cast to the schema dtypes as save_metadata does
+    schema = {col: dtype for col, dtype in METADATA_SCHEMA.items() if col in metadata_df.columns and col != 'lastUpdated'}
+    return metadata_df.astype(schema)
+
+def save_metadata(metadata_df: pd.DataFrame):
+    """
+    Saves the metadata dimension table.
+    Writes the CSV export used by Power BI and a Parquet copy for fast reloads in the app
+    (Parquet dictionary-encodes repeated strings such as 'sector' by default).
+    """
+    # Enforce the schema dtypes (rows merged from different sources may have been upcast to object)
+    schema = {col: dtype for col, dtype in METADATA_SCHEMA.items() if col in metadata_df.columns and col != 'lastUpdated'}
+    metadata_df = metadata_df.astype(schema)
+    if 'lastUpdated' in metadata_df.columns:
+        # Mixed strings/timestamps (CSV vs. fresh records) are stored as one datetime column
+        metadata_df['lastUpdated'] = pd.to_datetime(metadata_df['lastUpdated'], errors='coerce')
+    metadata_df.to_csv(dim_ticker_file, index=False)
+    metadata_df.to_parquet(dim_ticker_parquet, index=False, compression='zstd')
+
+# --- Financials manifest functions ---
+
+def load_financials_manifest() -> set:
+    """
+    Loads the set of tickers that have a financials file, as recorded by the ETL.
+    Returns None if the manifest has not been written yet.
+    """
+    try:
+        return set(pd.read_parquet(financials_manifest_file, columns=['Ticker'])['Ticker'])
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        print(f"Warning: Could not read financials manifest. {e}")
+        return None
+
+def save_financials_manifest(tickers: set):
+    """
+    Saves the set of tickers that have a financials file.
+    The manifest lives next to (not inside) the financials folder so Power BI does not load it.
+    """
+    try:
+        pd.DataFrame(sorted(tickers), columns=['Ticker']).to_parquet(financials_manifest_file, index=False)
+    except Exception as e:
+        print(f"Error saving financials manifest: {e}")
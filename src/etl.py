@@ -1,53 +1,112 @@
 # src/etl.py
 import pandas as pd
-import json
+import numpy as np
+import time
+import threading
 import yfinance as yf
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from .config import (
-    DATA_DIR, stocks_folder, dim_ticker_file,
-    prices_log_file
+    DATA_DIR, stocks_folder, prices_folder, financials_folder,
+    dim_ticker_file
     )
-from src.core import load_tickers
+from src.core import (
+    load_tickers, load_metadata, save_metadata, yf_download, METADATA_SCHEMA,
+    read_prices_log, save_prices_log, save_financials_manifest, parquet_tickers
+    )
+
+# --- Concurrency settings for yfinance requests ---
+MAX_WORKERS = 8             # Concurrent requests (the work is network-bound)
+MIN_REQUEST_INTERVAL = 0.5  # Seconds between request starts, to stay under Yahoo's rate limits
+PRICE_BATCH_SIZE = 20       # Tickers per yf.download request (Yahoo's per-URL symbol limit)
+
+# Columns of the fact_Prices table in the Power BI model, in file order
+PRICE_COLUMNS = ['Date', 'open', 'high', 'low', 'close', 'volume', 'dividends', 'stockSplits', 'Ticker']
+
+_throttle_lock = threading.Lock()
+_last_request_time = 0.0
+
+def _throttle():
+    """
+    Blocks until MIN_REQUEST_INTERVAL seconds have passed since the previous request.
+    Shared by all worker threads, so concurrent fetches are spaced out.
+    """
+    global _last_request_time
+    with _throttle_lock:
+        wait = _last_request_time + MIN_REQUEST_INTERVAL - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+        _last_request_time = time.monotonic()
 
 # --- Helper Functions for Log ---
 def load_prices_log() -> dict:
     """
     Loads the prices log and syncs it with the filesystem.
     If a parquet file is missing, the log entry is removed immediately.
+    If a parquet file has no entry (or the log itself is missing), the entry is
+    restored from the last date stored in the file footer.
     """
-    if prices_log_file.exists():
+    try:
         try:
-            with open(prices_log_file, 'r') as f:
-                log_data = json.load(f)
-            
-            # Sync logic
-            prices_folder = stocks_folder / 'prices'
-            clean_log = {}
-            log_modified = False
+            log_data = read_prices_log()
+        except FileNotFoundError:
+            log_data = {}
+        
+        # Sync logic: one directory scan and set differences, instead of one exists() check per ticker
+        existing = parquet_tickers(prices_folder)
+        missing = log_data.keys() - existing
+        unlogged = existing - log_data.keys()
+        
+        # If the log drifted from the files, fix it and save the file back to disk
+        if missing or unlogged:
+            clean_log = {ticker: date_str for ticker, date_str in log_data.items() if ticker not in missing}
+            for ticker in unlogged:
+                last_date = _last_price_date(prices_folder / f"{ticker}.parquet")
+                if last_date is not None:
+                    clean_log[ticker] = str(last_date.date())
+            save_prices_log(clean_log)
+            print(f"♻️  Synchronized prices log with the price files.")
+            return clean_log
+
+        return log_data
+    except Exception as e:
+        print(f"Error loading log: {e}")
+        return {}
 
-            for ticker, date_str in log_data.items():
-                file_path = prices_folder / f"{ticker}.parquet"
-                
-                # Only keep the entry if the file actually exists
-                if file_path.exists():
-                    clean_log[ticker] = date_str
-                else:
-                    log_modified = True # Mark for update
-            
-            # If we cleaned up any entries, save the file back to disk
-            if log_modified:
-                save_prices_log(clean_log)
-                print(f"♻️  Synchronized prices log: Removed entries for missing files.")
-                return clean_log
-
-            return log_data
-        except Exception as e:
-            print(f"Error loading log: {e}")
-            return {}
-    return {}
-
-def save_prices_log(log_dict: dict):
-    with open(prices_log_file, 'w') as f:
-        json.dump(log_dict, f, indent=4)
+def _last_price_date(stock_prices_file) -> pd.Timestamp:
+    """
+    Returns the last Date stored in a prices Parquet file, read from the
+    file footer (no rows are loaded): the 'max_date' key written by
+    update_stock_prices, or the row group statistics of older files.
+    Without statistics, only the Date column is read through a memory map.
+    Returns None if the file has no dates.
+    """
+    try:
+        md = pq.read_metadata(stock_prices_file)
+        if md.metadata and b'max_date' in md.metadata:
+            return pd.Timestamp(md.metadata[b'max_date'].decode())
+
+        date_col_idx = md.schema.names.index('Date')
+        max_dates = []
+        for i in range(md.num_row_groups):
+            stats = md.row_group(i).column(date_col_idx).statistics
+            if stats is None or not stats.has_min_max:
+                break
+            max_dates.append(stats.max)
+        else:
+            return pd.Timestamp(max(max_dates)) if max_dates else None
+
+        # Fallback: scan the Date column, backed by the OS page cache instead of a private copy
+        table = pq.read_table(stock_prices_file, memory_map=True, columns=['Date'])
+        last_date = pc.max(table.column('Date')).as_py()
+        return pd.Timestamp(last_date) if last_date is not None else None
+    except Exception as e:
+        print(f"Error reading {stock_prices_file.name} metadata: {e}")
+        return None
 
 # --- Vectorized Cleaning Function ---
 
@@ -62,51 +121,132 @@ def clean_prices(df: pd.DataFrame) -> pd.DataFrame:
     # Enforce numeric types for price and volume columns 
     numeric_cols = ['open', 'high', 'low', 'close', 'volume', 'dividends', 'stockSplits']
     cols_present = [c for c in numeric_cols if c in df.columns]
-    df[cols_present] = df[cols_present].apply(pd.to_numeric, errors='coerce')
+    # yfinance already returns numeric columns, so usually nothing needs converting
+    for col in cols_present:
+        if not pd.api.types.is_numeric_dtype(df[col]):
+            df[col] = pd.to_numeric(df[col], errors='coerce')
 
     # Anomaly detection: Mask non-positive prices and negative volumes 
+    # (one comparison per array; the columns are only rewritten when something was masked)
     price_cols = ['open', 'high', 'low', 'close']
     valid_prices = [c for c in price_cols if c in df.columns]
     if valid_prices:
-        df[valid_prices] = df[valid_prices].mask(df[valid_prices] <= 0)
+        prices = df[valid_prices].to_numpy(dtype='float64')
+        non_positive = prices <= 0
+        if non_positive.any():
+            prices[non_positive] = np.nan
+            df[valid_prices] = prices
     
     if 'volume' in df.columns:
-        df['volume'] = df['volume'].mask(df['volume'] < 0)
+        volume = df['volume'].to_numpy()
+        negative = volume < 0
+        if negative.any():
+            df['volume'] = np.where(negative, np.nan, volume)
     
     # Ensure chronological order and forward fill within ticker groups to prevent data leakage 
     df = df.sort_values(['Ticker', 'Date'])
-    df = df.groupby('Ticker', group_keys=False).apply(lambda x: x.ffill(limit=5))
+    fill_cols = [c for c in df.columns if c not in ('Ticker', 'Date')]
+    df[fill_cols] = df.groupby('Ticker', sort=False)[fill_cols].ffill(limit=5)
 
     return df
 
 # --- Data Extraction Functions ---
+
+@lru_cache(maxsize=1)
+def _etf_tickers() -> frozenset:
+    """
+    Returns the set of tickers listed in etfs.csv (parsed once, then cached).
+    """
+    return frozenset(pd.read_csv(DATA_DIR/'etfs.csv')['Ticker'])
+
+@lru_cache(maxsize=None)
+def _ticker(ticker: str) -> yf.Ticker:
+    """
+    Returns one yf.Ticker per symbol for the whole update run,
+    so the metadata and financials fetches reuse its session state.
+    """
+    return yf.Ticker(ticker)
+
+@lru_cache(maxsize=256)
+def _cached_info(ticker: str) -> dict:
+    """
+    Returns the yfinance info dict of a ticker, scraped once per update run.
+    """
+    return _ticker(ticker).info
+
+def _format_prices(data: pd.DataFrame, ticker: str) -> pd.DataFrame:
+    """
+    Renames yfinance price columns for schema alignment,
+    adds the Ticker column and moves the Date index to a timezone-naive column.
+    Extra columns (e.g. 'Capital Gains' for ETFs) are dropped, so every file keeps PRICE_COLUMNS.
+    """
+    data = data.rename(columns={
+        'Open': 'open', 'High': 'high', 'Low': 'low',
+        'Close': 'close', 'Volume': 'volume',
+        'Dividends': 'dividends', 'Stock Splits': 'stockSplits'
+    })
+
+    data['Ticker'] = ticker
+    data = data.rename_axis('Date').reset_index()
+    # Ensure 'Date' is timezone-naive for Parquet compatibility 
+    if data['Date'].dt.tz is not None:
+        data['Date'] = data['Date'].dt.tz_localize(None)
+
+    return data.reindex(columns=PRICE_COLUMNS)
   
 def fetch_prices(ticker: str, period: str = None, start: str = None, interval: str = '1d') -> pd.DataFrame:
     """Fetches raw data and renames columns for schema alignment."""
     try:
-        yf_ticker = yf.Ticker(ticker)
+        _throttle()
+        yf_ticker = _ticker(ticker)
         data = yf_ticker.history(period=period, start=start, interval=interval) if period or start else pd.DataFrame()
         
         if data.empty:
             return pd.DataFrame()
 
-        data.rename(columns={
-            'Open': 'open', 'High': 'high', 'Low': 'low',
-            'Close': 'close', 'Volume': 'volume',
-            'Dividends': 'dividends', 'Stock Splits': 'stockSplits'
-        }, inplace=True)
-
-        data['Ticker'] = ticker
-        data.reset_index(inplace=True)
-        # Ensure 'Date' is timezone-naive for Parquet compatibility 
-        if data['Date'].dt.tz is not None:
-            data['Date'] = data['Date'].dt.tz_localize(None)
-            
-        return data
+        return _format_prices(data, ticker)
     except Exception as e:
         print(f"Error fetching {ticker}: {e}")
         return pd.DataFrame()
 
+def fetch_prices_batch(tickers: list, start: str) -> list:
+    """
+    Fetches prices for several tickers sharing the same start date in one batched request.
+    Returns one DataFrame per ticker with data, in the same format as fetch_prices.
+    """
+    try:
+        # The gate spaces the start of each batch; with threads=False, yfinance then sends
+        # the batch's per-ticker requests one after another, so at most MAX_WORKERS are in flight
+        _throttle()
+        # Same adjusted prices and actions columns as Ticker.history.
+        # An empty result just means no new rows since start, so it is not retried
+        data = yf_download(
+            tickers, retry_empty=False, start=start, group_by='ticker',
+            threads=False, auto_adjust=True, actions=True
+            )
+        if data.empty:
+            return []
+
+        results = []
+        for ticker in tickers:
+            if isinstance(data.columns, pd.MultiIndex):
+                if ticker not in data.columns.get_level_values(0):
+                    continue
+                ticker_data = data[ticker]
+            else:
+                ticker_data = data
+            # Tickers in one batch share the date index, drop the dates this one has no data for
+            ticker_data = ticker_data.dropna(how='all')
+            # The shared index turns volume into float, restore the integer column Power BI expects
+            if 'Volume' in ticker_data.columns and not ticker_data['Volume'].isna().any():
+                ticker_data = ticker_data.astype({'Volume': 'int64'})
+            if not ticker_data.empty:
+                results.append(_format_prices(ticker_data, ticker))
+        return results
+    except Exception as e:
+        print(f"Error fetching batch {tickers}: {e}")
+        return []
+
 
 def fetch_metadata(ticker: str) -> dict:
     """
@@ -115,8 +255,8 @@ def fetch_metadata(ticker: str) -> dict:
     """
     metadata = {}
     try:
-        yf_ticker = yf.Ticker(ticker)
-        info = yf_ticker.info
+        _throttle()
+        info = _cached_info(ticker)
         metadata = {
             'Ticker': ticker,
             'shortName': info.get('shortName', ''),
@@ -137,8 +277,7 @@ def fetch_metadata(ticker: str) -> dict:
             # last METADATA update timestamp
             'lastUpdated': pd.Timestamp.now().strftime('%Y-%m-%d %H:%M:%S')           
         }
-        etfs_df = pd.read_csv(DATA_DIR/'etfs.csv')
-        if ticker in etfs_df['Ticker'].values:
+        if ticker in _etf_tickers():
             metadata['sector'] = 'ETF'
 
         print(f"Metadata for {ticker} extracted successfully.")
@@ -153,7 +292,8 @@ def fetch_financials(ticker: str) -> pd.DataFrame:
     transposes them for Power BI (Dates as rows), and adds Ticker/Type columns.
     """
     try:
-        yf_ticker = yf.Ticker(ticker)
+        _throttle()
+        yf_ticker = _ticker(ticker)
         
         # 1. Fetch Annual and Quarterly Data
         annual = yf_ticker.financials
@@ -200,113 +340,174 @@ def fetch_financials(ticker: str) -> pd.DataFrame:
 
 # --- Update Functions ---
 
+def _save_prices(ticker: str, ticker_new_data: pd.DataFrame, cutoff_date: pd.Timestamp) -> str:
+    """
+    Merges the cleaned new rows of one ticker into its Parquet file,
+    enforcing the rolling window. Returns the last stored date ('YYYY-MM-DD'),
+    or None if no rows fall inside the window (nothing is written).
+    """
+    stock_prices_file = prices_folder / f"{ticker}.parquet"
+    # The merge stays in Arrow: concat_tables chains the existing and new buffers without copying them.
+    # Only the columns of the Power BI model are stored (no pandas index column)
+    new_table = pa.Table.from_pandas(ticker_new_data, preserve_index=False)
+    
+    if stock_prices_file.exists():
+        # Read only the rows inside the 5-year rolling window (filtered while scanning the file).
+        # New data is sorted and only overlaps at the boundary: stored rows from its first date
+        # onwards are skipped, so the new values win without a deduplication pass
+        first_new_date = ticker_new_data['Date'].min()
+        existing_table = ds.dataset(stock_prices_file, format='parquet').to_table(
+            filter=(ds.field('Date') >= pa.scalar(cutoff_date)) & (ds.field('Date') < pa.scalar(first_new_date))
+            )
+        # Combine (e.g. int volumes are promoted to float if the new rows had masked values);
+        # schemas are unified, so older files with other columns are read back as they are
+        updated_table = pa.concat_tables(
+            [existing_table.replace_schema_metadata(new_table.schema.metadata), new_table],
+            promote_options='permissive'
+            )
+        # Keep only the fact_Prices columns (drops e.g. 'Capital Gains' left in older files)
+        updated_table = updated_table.select(
+            [col for col in PRICE_COLUMNS if col in updated_table.column_names]
+            )
+    else:
+        updated_table = new_table
+    # Enforce the 5-year rolling window
+    updated_table = updated_table.filter(pc.field('Date') >= pa.scalar(cutoff_date))
+    if updated_table.num_rows == 0:
+        return None
+    # Record the last date in the file footer, so it can be read back without loading rows
+    max_date = str(pc.max(updated_table['Date']).as_py().date())
+    updated_table = updated_table.replace_schema_metadata(
+        {**(updated_table.schema.metadata or {}), b'max_date': max_date.encode()}
+        )
+
+    # Dictionary-encode only the low-cardinality columns (constant Ticker, mostly-zero actions);
+    # prices are nearly unique per row, so they are stored plain.
+    # Snappy is the codec every Parquet reader supports (including Power BI), and the
+    # min/max statistics let readers skip data by Date (see _last_price_date)
+    pq.write_table(
+        updated_table, stock_prices_file, compression='snappy',
+        use_dictionary=['Ticker', 'dividends', 'stockSplits'], write_statistics=True
+        )
+    return max_date
+
 def update_stock_prices(tickers_df: pd.DataFrame):
     """
     Updates stock prices using batch extraction and vectorized cleaning.
     Enforces a strict 5-year rolling window for the Galaxy Schema.
     """
-    prices_folder = stocks_folder / 'prices'
     prices_folder.mkdir(parents=True, exist_ok=True)
     prices_log = load_prices_log()
     
-    all_new_data = []
-    cutoff_date = pd.Timestamp.now().normalize() - pd.DateOffset(years=5)
-
-    # Phase 1: Extraction
-    for _, row in tickers_df.iterrows():
-        ticker = row['Ticker']
+    updated_count = 0
+    today = pd.Timestamp.now().normalize() # Taken once for the whole run
+    cutoff_date = today - pd.DateOffset(years=5)
+
+    # Group tickers by start date, so each group is fetched with one batched request
+    tickers_by_start = {}
+    for ticker in tickers_df['Ticker'].tolist():
+        # Files without a log entry were restored into the log by load_prices_log
         last_date_str = prices_log.get(ticker)
         start_date = pd.to_datetime(last_date_str) + pd.Timedelta(days=1) if last_date_str else cutoff_date
 
-        if start_date.date() <= pd.Timestamp.now().date():
-            new_data = fetch_prices(ticker, start=start_date.strftime('%Y-%m-%d'))
-            if not new_data.empty:
-                all_new_data.append(new_data)
-
-    if not all_new_data:
+        # Up-to-date tickers are neither fetched nor read/rewritten in Phase 3
+        if start_date.normalize() <= today:
+            tickers_by_start.setdefault(start_date.strftime('%Y-%m-%d'), []).append(ticker)
+
+    # Phase 1: Extraction (concurrent, the requests are network-bound).
+    # Phases 2 and 3 run on this thread for each batch as soon as it arrives,
+    # so cleaning and writing overlap with the downloads still in flight.
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        futures = [
+            executor.submit(fetch_prices_batch, group_tickers[i:i + PRICE_BATCH_SIZE], start)
+            for start, group_tickers in tickers_by_start.items()
+            for i in range(0, len(group_tickers), PRICE_BATCH_SIZE)
+            ]
+
+        for future in as_completed(futures):
+            batch_data = future.result()
+            if not batch_data:
+                continue
+
+            # Phase 2: Vectorized Cleaning (rules are applied per ticker, so batches are independent)
+            cleaned_new_df = clean_prices(pd.concat(batch_data))
+
+            # Phase 3: Distribution and Persistence (the batch is split by ticker in a single pass)
+            for ticker, ticker_new_data in cleaned_new_df.groupby('Ticker', sort=False):
+                try:
+                    last_date = _save_prices(ticker, ticker_new_data, cutoff_date)
+                    if last_date is None:
+                        continue
+                    prices_log[ticker] = last_date
+                    updated_count += 1
+                except Exception as e:
+                    # One bad file must not abort the run, the ticker is retried next time
+                    print(f"Error saving prices for {ticker}: {e}")
+
+    if not updated_count:
         print("Database is already up to date.")
         return
 
-    # Phase 2: Vectorized Cleaning
-    combined_new_df = pd.concat(all_new_data)
-    cleaned_new_df = clean_prices(combined_new_df)
-
-    # Phase 3: Distribution and Persistence
-    for ticker in cleaned_new_df['Ticker'].unique():
-        ticker_new_data = cleaned_new_df[cleaned_new_df['Ticker'] == ticker].copy()
-        stock_prices_file = prices_folder / f"{ticker}.parquet"
-        
-        if stock_prices_file.exists():
-            existing_data = pd.read_parquet(stock_prices_file)
-            # Combine and enforce the 5-year rolling window 
-            updated_data = pd.concat([existing_data, ticker_new_data])
-            updated_data = updated_data[updated_data['Date'] >= cutoff_date]
-            updated_data = updated_data.drop_duplicates(subset=['Date'], keep='last')
-        else:
-            updated_data = ticker_new_data
-
-        updated_data.to_parquet(stock_prices_file)
-        prices_log[ticker] = str(updated_data['Date'].max().date())
-
     save_prices_log(prices_log)
     print("Batch price update completed successfully.")
 
 def update_stock_metadata(tickers_df: pd.DataFrame) -> pd.DataFrame:
     """
     Updates the dimension table (dim_ticker).
-    Strictly follows 7-day rule using the CSV 'lastUpdated' column.
+    Strictly follows 7-day rule using the 'lastUpdated' column.
     """
     metadata_list = []
+    now = pd.Timestamp.now() # Taken once for the whole run
 
-    # Load existing CSV
-    if dim_ticker_file.exists():
-        try:
-            existing_metadata = pd.read_csv(dim_ticker_file)
-        except Exception as e:
-            print(f"Error reading metadata file: {e}. Starting fresh.")
-            existing_metadata = pd.DataFrame(columns=['Ticker', 'lastUpdated'])
-    else:
-        # Recovery Mode
-        print(f"⚠️  {dim_ticker_file.name} is missing. Starting full metadata rebuild for {len(tickers_df)} tickers...")
+    # Load existing metadata (Parquet copy, or CSV export as fallback)
+    try:
+        existing_metadata = load_metadata()
+        if existing_metadata.empty:
+            # Recovery Mode
+            print(f"⚠️  {dim_ticker_file.name} is missing. Starting full metadata rebuild for {len(tickers_df)} tickers...")
+    except Exception as e:
+        print(f"Error reading metadata file: {e}. Starting fresh.")
         existing_metadata = pd.DataFrame(columns=['Ticker', 'lastUpdated'])
 
-    for _, row in tickers_df.iterrows():
-        ticker = row['Ticker']
-        
-        # Check if we have fresh data (7-day rule)
-        if ticker in existing_metadata['Ticker'].values:
-            last_updated_vals = existing_metadata.loc[existing_metadata['Ticker'] == ticker, 'lastUpdated'].values
+    # Tickers to fetch: missing file, missing ticker, or old data
+    if 'lastUpdated' in existing_metadata.columns:
+        # One join with the last update per ticker (unparseable dates become NaT)
+        last_updates = existing_metadata[['Ticker', 'lastUpdated']].drop_duplicates(subset=['Ticker'], keep='last')
+        merged = tickers_df[['Ticker']].merge(last_updates, on='Ticker', how='left')
+        last_updated = pd.to_datetime(merged['lastUpdated'], errors='coerce')
+
+        # Check if we have fresh data (7-day rule), fresh tickers skip the API call
+        stale_mask = last_updated.isna() | ((now - last_updated).dt.days >= 7)
+        tickers_to_fetch = merged.loc[stale_mask, 'Ticker'].tolist()
+    else:
+        tickers_to_fetch = tickers_df['Ticker'].tolist()
+
+    # Fetch concurrently (network-bound), results come back in the order of tickers_to_fetch
+    last_updated_str = now.strftime('%Y-%m-%d %H:%M:%S')
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        for ticker_metadata in executor.map(fetch_metadata, tickers_to_fetch):
             
-            # If we have a date, check if it's recent
-            if len(last_updated_vals) > 0 and pd.notna(last_updated_vals[0]):
-                try:
-                    last_updated = pd.to_datetime(last_updated_vals[0])
-                    if (pd.Timestamp.now() - last_updated).days < 7:
-                        # Data is fresh enough, skip API call
-                        continue 
-                except Exception:
-                    pass # Date parsing failed, fetch new data
-
-        # Fetch new data (Missing file, missing ticker, or old data)
-        ticker_metadata = fetch_metadata(ticker)
-        
-        if ticker_metadata:
-            # Ensure timestamp is set here
-            ticker_metadata['lastUpdated'] = pd.Timestamp.now().strftime('%Y-%m-%d %H:%M:%S')
-            metadata_list.append(ticker_metadata)
+            if ticker_metadata:
+                # Ensure timestamp is set here
+                ticker_metadata['lastUpdated'] = last_updated_str
+                metadata_list.append(ticker_metadata)
 
     # Save changes
     if metadata_list:
-        new_metadata_df = pd.DataFrame(metadata_list)
+        # Known schema: no per-column type inference on the fetched records
+        new_metadata_df = pd.DataFrame.from_records(metadata_list, columns=list(METADATA_SCHEMA)).astype(METADATA_SCHEMA)
         
         if not existing_metadata.empty:
-            combined_metadata = pd.concat([existing_metadata, new_metadata_df])
+            # Align the stored rows to the same dtypes first (an all-null stored column, e.g. an ETF's
+            # 'industry', must not be concatenated under another dtype than the fetched one)
+            stored_schema = {col: dtype for col, dtype in METADATA_SCHEMA.items() if col in existing_metadata.columns}
+            combined_metadata = pd.concat([existing_metadata.astype(stored_schema), new_metadata_df])
             # Keep the NEWEST version of the duplicate
             combined_metadata = combined_metadata.drop_duplicates(subset=['Ticker'], keep='last')
         else:
             combined_metadata = new_metadata_df
             
-        combined_metadata.to_csv(dim_ticker_file, index=False)
+        save_metadata(combined_metadata)
         print(f"✅ Dimension table updated with {len(new_metadata_df)} new/updated records.")
         return combined_metadata
     else:
@@ -319,22 +520,35 @@ def update_stock_financials(tickers_df: pd.DataFrame):
     Updates the financials (fundamental) data for all tickers.
     Saves as Parquet files in a 'financials' subfolder.
     """
-    financials_folder = stocks_folder / 'financials'
     financials_folder.mkdir(parents=True, exist_ok=True)
     
-    for _, row in tickers_df.iterrows():
-        ticker = row['Ticker']
-        financials_file = financials_folder / f"{ticker}.parquet"
-        
-        # Financials data is overwrited in case it's updated or corrected by yfinance
-        new_data = fetch_financials(ticker)
-        
-        if not new_data.empty:
-            # Convert columns to string to avoid Parquet schema issues 
-            new_data.columns = new_data.columns.astype(str)
+    # Fetch concurrently (network-bound), write on this thread as soon as each result arrives.
+    # Written results are released right away, so memory stays bounded by the fetches in flight.
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        futures = {}
+        for ticker in tickers_df['Ticker'].tolist():
+            futures[executor.submit(fetch_financials, ticker)] = ticker
+
+        for future in as_completed(futures):
+            ticker = futures.pop(future)
+            financials_file = financials_folder / f"{ticker}.parquet"
             
-            new_data.to_parquet(financials_file)
-            print(f"Financials for {ticker} saved to {financials_file}")
+            # Financials data is overwrited in case it's updated or corrected by yfinance
+            new_data = future.result()
+            
+            if not new_data.empty:
+                # Convert columns to string to avoid Parquet schema issues 
+                new_data.columns = new_data.columns.astype(str)
+                
+                # Snappy with dictionary encoding for the repeated Ticker/PeriodType strings
+                new_data.to_parquet(
+                    financials_file, engine='pyarrow', compression='snappy',
+                    use_dictionary=True, write_statistics=True
+                    )
+                print(f"Financials for {ticker} saved to {financials_file}")
+
+    # Record which tickers have financials, so the dashboard reads one file instead of the folder
+    save_financials_manifest(parquet_tickers(financials_folder))
 
 # --- Update execution ---
 
@@ -349,6 +563,10 @@ def update_stock_database():
     Updates both stock prices and metadata databases.
     """
     tickers_df = load_tickers()   
+    # Start each run with fresh yfinance objects and info, and pick up edits to etfs.csv made while the app is running
+    _ticker.cache_clear()
+    _cached_info.cache_clear()
+    _etf_tickers.cache_clear()
     stocks_folder.mkdir(parents=True, exist_ok=True)
     update_stock_prices(tickers_df)
     update_stock_metadata(tickers_df)